@@ -13,219 +13,514 @@ Steps:
 5. Convert to physical units
 6. Measure and fit the mass–size relation
 7. Save publication-quality figures
+
+Usage:
+    python scripts/explore_nsa.py [--verbose]
 """
 
 # ----------------------------------------------------
 # Imports
 # ----------------------------------------------------
+import argparse
 import os
+import re
 from astropy.io import fits
-from astropy.table import Table
 from astropy.cosmology import FlatLambdaCDM
 import astropy.units as u
 
 import numpy as np
 import matplotlib.pyplot as plt
+from matplotlib.colors import LogNorm
+
+# fitsio (cfitsio bindings) reads FITS tables much faster than astropy;
+# fall back to astropy.io.fits when it is not installed.
+try:
+    import fitsio
+except ImportError:
+    fitsio = None
+
+# Numba compiles the fitting kernels into parallel machine code; the NumPy
+# versions below are used when it is not installed.
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+# numexpr evaluates the quality mask in one cache-blocked, multithreaded
+# pass; plain NumPy is used when it is not installed.
+try:
+    import numexpr as ne
+except ImportError:
+    ne = None
 
 # ----------------------------------------------------
-# Load data
-# ----------------------------------------------------
-
-BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-DATA_PATH = os.path.join(BASE_DIR, "data", "nsa_v1_0_1.fits")
-
-if not os.path.exists(DATA_PATH):
-    raise FileNotFoundError(
-        f"\nNSA FITS file not found at: {DATA_PATH}\n"
-        "Please download the NSA catalog and place it inside the 'data/' directory.\n"
-    )
-
-
-print("Opening NSA FITS file...")
-hdul = fits.open(DATA_PATH)
-hdul.info()
-
-data = Table(hdul[1].data)
-
-print("\nNumber of galaxies in NSA catalog:", len(data))
-
-# ----------------------------------------------------
-# Column inspection (informational)
+# Helpers
 # ----------------------------------------------------
 
-print("\nFirst 30 column names:")
-for col in data.colnames[:30]:
-    print(col)
+def _moment_sums_numpy(logM, size_kpc, split, M0):
+    x = logM - M0
+    y = np.log10(size_kpc)
+
+    # Plain slice sums rather than np.add.reduceat, which returns the first
+    # element instead of zero for an empty segment. Inputs may be float32;
+    # accumulate the sums in double precision.
+    rows = []
+    for seg in (slice(None, split), slice(split, None)):
+        xs = x[seg]
+        ys = y[seg]
+        rows.append((
+            len(xs),
+            xs.sum(dtype=np.float64),
+            ys.sum(dtype=np.float64),
+            (xs * xs).sum(dtype=np.float64),
+            (xs * ys).sum(dtype=np.float64),
+        ))
+    return np.array(rows, dtype=np.float64)
+
+
+if njit is not None:
+    @njit(parallel=True, fastmath=True)
+    def _moment_sums_numba(logM, size_kpc, split, M0):
+        n_d = sx_d = sy_d = sxx_d = sxy_d = 0.0
+        n_s = sx_s = sy_s = sxx_s = sxy_s = 0.0
+
+        for i in prange(logM.shape[0]):
+            xi = logM[i] - M0
+            yi = np.log10(size_kpc[i])
+            if i < split:
+                n_d += 1.0
+                sx_d += xi
+                sy_d += yi
+                sxx_d += xi * xi
+                sxy_d += xi * yi
+            else:
+                n_s += 1.0
+                sx_s += xi
+                sy_s += yi
+                sxx_s += xi * xi
+                sxy_s += xi * yi
+
+        return ((n_d, sx_d, sy_d, sxx_d, sxy_d),
+                (n_s, sx_s, sy_s, sxx_s, sxy_s))
+
+    # No fastmath here: reassociating the Welford updates would undo the
+    # numerical stability they are there for
+    @njit(parallel=True)
+    def _residual_scatter_numba(logM, size_kpc, alpha, beta, M0, n_chunks):
+        n = logM.shape[0]
+        count = np.zeros(n_chunks)
+        mean = np.zeros(n_chunks)
+        m2 = np.zeros(n_chunks)
+
+        # Welford's update within each chunk, chunks in parallel
+        for c in prange(n_chunks):
+            k = 0.0
+            mu = 0.0
+            acc = 0.0
+            for i in range(c * n // n_chunks, (c + 1) * n // n_chunks):
+                r = np.log10(size_kpc[i]) - (alpha * (logM[i] - M0) + beta)
+                k += 1.0
+                delta = r - mu
+                mu += delta / k
+                acc += delta * (r - mu)
+            count[c] = k
+            mean[c] = mu
+            m2[c] = acc
+
+        # Merge the partial results (Chan et al. pairwise update)
+        n_tot = count[0]
+        mu_tot = mean[0]
+        m2_tot = m2[0]
+        for c in range(1, n_chunks):
+            n_c = count[c]
+            n_new = n_tot + n_c
+            d = mean[c] - mu_tot
+            mu_tot += d * n_c / n_new
+            m2_tot += m2[c] + d * d * n_tot * n_c / n_new
+            n_tot = n_new
+
+        return np.sqrt(m2_tot / n_tot)
+
+
+def moment_sums(logM, size_kpc, split, M0):
+    """
+    Moment sums of x = logM - M0 and y = log10(size_kpc) for the mass–size fits.
+
+    The sample must be ordered so that the disk-like galaxies occupy
+    ``[:split]`` and the spheroid-like ones ``[split:]``.
+    Returns a (2, 5) array of (n, Σx, Σy, Σxx, Σxy), one row per class.
+    Summing the rows gives the moments of the full sample.
+    """
+    if njit is not None:
+        return np.array(_moment_sums_numba(logM, size_kpc, split, M0))
+    return _moment_sums_numpy(logM, size_kpc, split, M0)
+
+
+def fit_moments(sums):
+    """
+    Least-squares fit of y = alpha * x + beta from moment sums.
+
+    ``sums`` is one (n, Σx, Σy, Σxx, Σxy) row, or a stack of them.
+    Returns (alpha, beta).
+    """
+    n, sx, sy, sxx, sxy = np.asarray(sums, dtype=float).T
+
+    alpha = (sxy - sx * sy / n) / (sxx - sx * sx / n)
+    beta = (sy - alpha * sx) / n
+
+    return alpha, beta
+
+
+def residual_scatter(logM, size_kpc, alpha, beta, M0):
+    """
+    Standard deviation of log10(size_kpc) about the line alpha * (logM - M0) + beta.
+
+    Computed from the residuals directly rather than from moment sums, which
+    lose precision to cancellation: the Numba kernel runs Welford's update
+    on chunks in parallel and merges them, the NumPy fallback takes np.std of
+    the residual array. Returns NaN for an empty sample.
+    """
+    if len(logM) == 0:
+        return np.nan
+
+    if njit is not None:
+        n_chunks = min(len(logM), 64)
+        return _residual_scatter_numba(logM, size_kpc, alpha, beta, M0, n_chunks)
+
+    # Two working buffers, updated in place
+    resid = np.log10(size_kpc)
+    line = logM - M0
+    line *= alpha
+    line += beta
+    resid -= line
+    return np.std(resid, dtype=np.float64)
 
-print("\n=== Stellar mass related columns ===")
-for col in data.colnames:
-    if "MASS" in col.upper() or "MSTAR" in col.upper():
-        print(col)
-
-print("\n=== Galaxy size related columns ===")
-for col in data.colnames:
-    key = col.upper()
-    if ("TH50" in key or "PETRO" in key or "SERSIC" in key):
-        print(col)
 
 # ----------------------------------------------------
-# Sanity checks
+# Load data
 # ----------------------------------------------------
 
-mass = data["SERSIC_MASS"]
-size = data["SERSIC_TH50"]
-
-print("\n=== SERSIC_MASS sanity check ===")
-print("Min:", np.nanmin(mass))
-print("Max:", np.nanmax(mass))
-print("Median:", np.nanmedian(mass))
-
-print("\n=== SERSIC_TH50 sanity check ===")
-print("Min:", np.nanmin(size))
-print("Max:", np.nanmax(size))
-print("Median:", np.nanmedian(size))
-
-# ----------------------------------------------------
-# Quality cuts
-# ----------------------------------------------------
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_PATH = os.path.join(BASE_DIR, "data", "nsa_v1_0_1.fits")
 
-good = (
-    (data["SERSIC_OK"] == 1) &
-    np.isfinite(data["SERSIC_MASS"]) &
-    np.isfinite(data["SERSIC_TH50"]) &
-    (data["SERSIC_MASS"] > 0) &
-    (data["SERSIC_TH50"] > 0)
-)
+# Cleaned (logM, Re, n) sample, cached so reruns skip the FITS read
+CACHE_PATH = os.path.join(BASE_DIR, "data", "nsa_clean.npz")
 
-print("\nNumber of galaxies before cuts:", len(data))
-print("Number of galaxies after quality cuts:", np.sum(good))
+# Only these columns are used downstream; everything else stays unread on disk
+COLUMNS = ("SERSIC_OK", "SERSIC_MASS", "SERSIC_TH50", "SERSIC_N", "Z")
 
-#-----------------------------------------------------
-# Sérsic index (morphology proxy)
-sersic_n = data["SERSIC_N"][good]
-# ----------------------------------------------------
-# Physical conversions
-# ----------------------------------------------------
+# Column-name patterns for the informational column listing
+MASS_COLUMN = re.compile(r"MASS|MSTAR", re.IGNORECASE)
+SIZE_COLUMN = re.compile(r"TH50|PETRO|SERSIC", re.IGNORECASE)
 
 cosmo = FlatLambdaCDM(H0=70, Om0=0.3)
 
-mass = data["SERSIC_MASS"][good]
-logM = np.log10(mass)
-
-size_arcsec = data["SERSIC_TH50"][good]
-z = data["Z"][good]
-
-ang_diam_dist = cosmo.angular_diameter_distance(z)
-size_kpc = (size_arcsec * u.arcsec).to(u.rad).value * ang_diam_dist.to(u.kpc).value
+ARCSEC_TO_RAD = np.pi / 648000.0
 
-# ----------------------------------------------------
-# Minimum physical size cut
-# ----------------------------------------------------
-
-size_cut = size_kpc > 0.5  # kpc
-
-logM_clean = logM[size_cut]
-size_kpc_clean = size_kpc[size_cut]
-
-sersic_n_clean = sersic_n[size_cut]
-
-# Morphology masks
-disk = sersic_n_clean < 2.5
-spheroid = sersic_n_clean >= 2.5
-
-print("\nMorphology split:")
-print("Disk-like galaxies (n < 2.5):", np.sum(disk))
-print("Spheroid-like galaxies (n >= 2.5):", np.sum(spheroid))
-
-print("\nAfter size cut (Re > 0.5 kpc):")
-print("Number of galaxies:", len(logM_clean))
-
-# ----------------------------------------------------
-# Quantify the mass–size relation
-# ----------------------------------------------------
-
-logRe = np.log10(size_kpc_clean)
-
-M0 = 10.0  # pivot mass
-x = logM_clean - M0
-y = logRe
-
-alpha, beta = np.polyfit(x, y, 1)
+MIN_SIZE_KPC = 0.5  # minimum physical half-light radius
 
-# Prepare log sizes
-logRe_clean = np.log10(size_kpc_clean)
-
-M0 = 10.0 # same pivot
-
-# Disk fit
-x_disk = logM_clean[disk]-M0
-y_disk = logRe_clean[disk]
-alpha_d, beta_d = np.polyfit(x_disk, y_disk, 1)
-
-# Spheroid fit
-x_sph = logM_clean[spheroid]- M0
-y_sph = logRe_clean[spheroid]
-alpha_s, beta_s = np.polyfit(x_sph, y_sph, 1)
-
-print("\nMass-size relation by morphology:")
-print(f"Disk-like (n < 2.5): alpha = {alpha_d:.3f}, beta = {beta_d:.3f}")
-print(f"Spheroid-like (n >= 2.5): alpha = {alpha_s:.3f}, beta = {beta_s:.3f}")
-
-scatter = np.std(y - (alpha * x + beta))
-
-print("\nMass–size relation fit:")
-print(f"Slope alpha = {alpha:.3f}")
-print(f"Intercept beta = {beta:.3f}  (at logM = {M0})")
-print(f"Scatter (dex in log Re): {scatter:.3f}")
-
-# ----------------------------------------------------
-# Plot with fitted relation
-# ----------------------------------------------------
+# Identifies how the cached sample was built. Bump CACHE_VERSION whenever
+# build_clean_sample changes what it returns (cuts, dtypes, transforms).
+CACHE_VERSION = 1
+CACHE_KEY = (
+    f"v{CACHE_VERSION};H0={cosmo.H0.value};Om0={cosmo.Om0};"
+    f"min_size_kpc={MIN_SIZE_KPC};dtype=float32"
+)
 
-xfit = np.linspace(x.min(), x.max(), 200)
-yfit = alpha * xfit + beta
 
-plt.figure(figsize=(6, 5))
-plt.scatter(logM_clean, size_kpc_clean, s=1, alpha=0.1, label="Galaxies")
-plt.plot(xfit + M0, 10**yfit, color="black", linewidth=2,
-         label=rf"Fit: $\alpha={alpha:.2f}$")
+def build_clean_sample(verbose=False):
+    """
+    Read the NSA catalog, apply the quality and size cuts and convert to
+    physical units.
+
+    With ``verbose``, also print the HDU summary, the catalog column listing
+    and sanity statistics of the mass and size columns.
+    Returns (logM_clean, size_kpc_clean, sersic_n_clean).
+    """
+    print("Opening NSA FITS file...")
+    if fitsio is not None:
+        with fitsio.FITS(DATA_PATH) as fits_file:
+            if verbose:
+                print(fits_file)
+
+            hdu = fits_file[1]
+            colnames = hdu.get_colnames()
+            n_galaxies = hdu.get_nrows()
+
+            raw = hdu.read(columns=list(COLUMNS))
+            data = {name: raw[name] for name in COLUMNS}
+    else:
+        with fits.open(DATA_PATH, memmap=True, lazy_load_hdus=True) as hdul:
+            if verbose:
+                hdul.info()
+
+            raw = hdul[1].data
+            colnames = raw.columns.names
+            n_galaxies = len(raw)
+
+            data = {name: np.asarray(raw[name]) for name in COLUMNS}
+
+    # Single precision is ample for the downstream statistics and halves the
+    # memory traffic of the numeric pipeline
+    for name in ("SERSIC_MASS", "SERSIC_TH50", "Z"):
+        data[name] = data[name].astype(np.float32, copy=False)
+
+    print("\nNumber of galaxies in NSA catalog:", n_galaxies)
+
+    if verbose:
+        # ----------------------------------------------------
+        # Column inspection (informational)
+        # ----------------------------------------------------
+
+        print("\nFirst 30 column names:")
+        for col in colnames[:30]:
+            print(col)
+
+        # Single pass over the column names; a column may land in both groups
+        # (e.g. SERSIC_MASS)
+        mass_cols = []
+        size_cols = []
+        for col in colnames:
+            if MASS_COLUMN.search(col):
+                mass_cols.append(col)
+            if SIZE_COLUMN.search(col):
+                size_cols.append(col)
+
+        print("\n=== Stellar mass related columns ===")
+        print("\n".join(mass_cols))
+
+        print("\n=== Galaxy size related columns ===")
+        print("\n".join(size_cols))
+
+        # ----------------------------------------------------
+        # Sanity checks
+        # ----------------------------------------------------
+
+        mass = data["SERSIC_MASS"]
+        size = data["SERSIC_TH50"]
+
+        print("\n=== SERSIC_MASS sanity check ===")
+        print("Min:", np.nanmin(mass))
+        print("Max:", np.nanmax(mass))
+        print("Median:", np.nanmedian(mass))
+
+        print("\n=== SERSIC_TH50 sanity check ===")
+        print("Min:", np.nanmin(size))
+        print("Max:", np.nanmax(size))
+        print("Median:", np.nanmedian(size))
+
+    # ----------------------------------------------------
+    # Quality cuts
+    # ----------------------------------------------------
+
+    if ne is not None:
+        # Comparisons with NaN are False, so 0 < x < inf is the same test as
+        # isfinite(x) & (x > 0)
+        good = ne.evaluate(
+            "(ok == 1) & (m > 0) & (m < inf) & (s > 0) & (s < inf)",
+            local_dict={
+                "ok": data["SERSIC_OK"].astype(np.int32, copy=False),
+                "m": data["SERSIC_MASS"],
+                "s": data["SERSIC_TH50"],
+                "inf": np.inf,
+            },
+        )
+    else:
+        good = (
+            (data["SERSIC_OK"] == 1) &
+            np.isfinite(data["SERSIC_MASS"]) &
+            np.isfinite(data["SERSIC_TH50"]) &
+            (data["SERSIC_MASS"] > 0) &
+            (data["SERSIC_TH50"] > 0)
+        )
+
+    print("\nNumber of galaxies before cuts:", n_galaxies)
+    print("Number of galaxies after quality cuts:", np.sum(good))
+
+    # ----------------------------------------------------
+    # Physical conversions
+    # ----------------------------------------------------
+
+    # Sizes are evaluated for the whole catalog; rows failing the quality cuts
+    # come out as NaN or junk and are dropped by the combined mask below.
+    size_arcsec = data["SERSIC_TH50"]
+    z = data["Z"]
+
+    # Tabulate the comoving distance once on a fine redshift grid and interpolate,
+    # rather than evaluating it for every galaxy. FlatLambdaCDM evaluates the
+    # grid in a single vectorised call. The quality cuts do not check Z, so
+    # NaN redshifts are skipped when picking the upper limit.
+    z_grid = np.linspace(0.0, np.nanmax(z, where=good, initial=0.0) * 1.001, 4096)
+    comoving_grid = cosmo.comoving_distance(z_grid).to_value(u.kpc)
+
+    ang_diam_dist = np.interp(z, z_grid, comoving_grid)
+    ang_diam_dist /= 1.0 + z  # kpc
+
+    size_kpc = np.multiply(size_arcsec, ang_diam_dist, out=np.empty_like(size_arcsec))
+    size_kpc *= ARCSEC_TO_RAD
+    del ang_diam_dist
+
+    # ----------------------------------------------------
+    # Minimum physical size cut
+    # ----------------------------------------------------
+
+    # Combine quality and size cuts so every column is indexed exactly once
+    keep = good & (size_kpc > MIN_SIZE_KPC)
+
+    # The masked copy is already a private float32 buffer; take the log in place
+    logM_clean = data["SERSIC_MASS"][keep]
+    np.log10(logM_clean, out=logM_clean)
+    size_kpc_clean = size_kpc[keep]
+
+    # Sérsic index (morphology proxy)
+    sersic_n_clean = data["SERSIC_N"][keep]
+
+    return logM_clean, size_kpc_clean, sersic_n_clean
+
+
+def load_cached_sample():
+    """
+    Load the cleaned sample from CACHE_PATH.
+
+    Returns (logM_clean, size_kpc_clean, sersic_n_clean), or None when the
+    cache is missing, older than the FITS file, or was built with a
+    different CACHE_KEY.
+    """
+    if not (os.path.exists(CACHE_PATH)
+            and os.path.getmtime(CACHE_PATH) > os.path.getmtime(DATA_PATH)):
+        return None
+
+    with np.load(CACHE_PATH) as cache:
+        if "key" not in cache.files or cache["key"].item() != CACHE_KEY:
+            return None
+        return cache["logM"], cache["size_kpc"], cache["sersic_n"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--verbose", action="store_true",
+        help="print the catalog column listing and sanity checks; this re-reads "
+             "the FITS catalog instead of using the cached sample",
+    )
+    args = parser.parse_args()
+
+    if not os.path.exists(DATA_PATH):
+        raise FileNotFoundError(
+            f"\nNSA FITS file not found at: {DATA_PATH}\n"
+            "Please download the NSA catalog and place it inside the 'data/' directory.\n"
+        )
+
+    # ----------------------------------------------------
+    # Cleaned sample
+    # ----------------------------------------------------
+
+    # The informational output comes from the catalog read, so --verbose
+    # always bypasses the cache
+    sample = None if args.verbose else load_cached_sample()
+    if sample is not None:
+        print("Loading cleaned sample from cache:", CACHE_PATH)
+        logM_clean, size_kpc_clean, sersic_n_clean = sample
+    else:
+        logM_clean, size_kpc_clean, sersic_n_clean = build_clean_sample(args.verbose)
+        np.savez(CACHE_PATH, key=CACHE_KEY, logM=logM_clean,
+                 size_kpc=size_kpc_clean, sersic_n=sersic_n_clean)
+
+    # Order the sample by Sérsic index so each morphology class is a contiguous
+    # slice; fits and plots then work on views instead of boolean-mask copies
+    order = np.argsort(sersic_n_clean)
+    logM_clean = logM_clean[order]
+    size_kpc_clean = size_kpc_clean[order]
+    sersic_n_clean = sersic_n_clean[order]
+
+    split = np.searchsorted(sersic_n_clean, 2.5)
+    disk = slice(None, split)       # n < 2.5
+    spheroid = slice(split, None)   # n >= 2.5
+
+    print("\nMorphology split:")
+    print("Disk-like galaxies (n < 2.5):", split)
+    print("Spheroid-like galaxies (n >= 2.5):", len(sersic_n_clean) - split)
+
+    print("\nAfter size cut (Re > 0.5 kpc):")
+    print("Number of galaxies:", len(logM_clean))
+
+    # ----------------------------------------------------
+    # Quantify the mass–size relation
+    # ----------------------------------------------------
+
+    M0 = 10.0  # pivot mass
+
+    # One traversal gives the disk and spheroid moments; their sum is the
+    # full sample
+    sums = moment_sums(logM_clean, size_kpc_clean, split, M0)
+
+    (alpha_d, alpha_s), (beta_d, beta_s) = fit_moments(sums)
+    alpha, beta = fit_moments(sums.sum(axis=0))
+
+    scatter = residual_scatter(logM_clean, size_kpc_clean, alpha, beta, M0)
+
+    print("\nMass-size relation by morphology:")
+    print(f"Disk-like (n < 2.5): alpha = {alpha_d:.3f}, beta = {beta_d:.3f}")
+    print(f"Spheroid-like (n >= 2.5): alpha = {alpha_s:.3f}, beta = {beta_s:.3f}")
+
+    print("\nMass–size relation fit:")
+    print(f"Slope alpha = {alpha:.3f}")
+    print(f"Intercept beta = {beta:.3f}  (at logM = {M0})")
+    print(f"Scatter (dex in log Re): {scatter:.3f}")
+
+    # ----------------------------------------------------
+    # Plot with fitted relations
+    # ----------------------------------------------------
+
+    # Both panels share the same fit abscissa and R_e axis, and are written out
+    # as a single figure
+    xfit = np.linspace(logM_clean.min() - M0, logM_clean.max() - M0, 200)
+
+    yfit = alpha * xfit + beta
+    yfit_disk = alpha_d * xfit + beta_d
+    yfit_sph = alpha_s * xfit + beta_s
+
+    fig, (ax_all, ax_morph) = plt.subplots(1, 2, figsize=(11, 5), sharey=True)
+
+    # Left: full sample. Bin the point cloud onto a 2-D grid in (log M, log Re)
+    # so drawing cost scales with the number of bins rather than galaxies
+    counts, m_edges, re_edges = np.histogram2d(
+        logM_clean, np.log10(size_kpc_clean), bins=(300, 200)
+    )
 
-plt.xlabel(r"$\log_{10}(M_\star/M_\odot)$")
-plt.ylabel(r"$R_e$ [kpc]")
-plt.yscale("log")
-plt.title("Galaxy Stellar Mass–Size Relation (NSA)\n$R_e > 0.5$ kpc")
-plt.legend(frameon=False)
-plt.tight_layout()
-plt.savefig("mass_size_relation_fit.png", dpi=300)
-plt.close()
+    mesh = ax_all.pcolormesh(m_edges, 10**re_edges, counts.T, norm=LogNorm(),
+                             cmap="Blues", rasterized=True)
+    fig.colorbar(mesh, ax=ax_all, label="Galaxies per bin")
+    ax_all.plot(xfit + M0, 10**yfit, color="black", linewidth=2,
+                label=rf"Fit: $\alpha={alpha:.2f}$")
 
-#-----------------------------------------------------
-# Generate fitted lines
+    ax_all.set_xlabel(r"$\log_{10}(M_\star/M_\odot)$")
+    ax_all.set_ylabel(r"$R_e$ [kpc]")
+    ax_all.set_yscale("log")
+    ax_all.set_title("Galaxy Stellar Mass–Size Relation (NSA)\n$R_e > 0.5$ kpc")
+    ax_all.legend(frameon=False)
 
-xfit = np.linspace(logM_clean.min() - M0, logM_clean.max() - M0, 200)
+    # Right: split by morphology
+    ax_morph.plot(logM_clean[disk], size_kpc_clean[disk], ".", color="C0", markersize=2,
+                  alpha=0.1, rasterized=True, label="Disk-like (n < 2.5)")
+    ax_morph.plot(logM_clean[spheroid], size_kpc_clean[spheroid], ".", color="C1", markersize=2,
+                  alpha=0.1, rasterized=True, label="Spheroid-like (n ≥ 2.5)")
 
-yfit_disk = alpha_d * xfit + beta_d
-yfit_sph = alpha_s * xfit + beta_s
+    ax_morph.plot(xfit + M0, 10**yfit_disk, color="C0", linewidth=2,
+                  label=rf"Disk fit ($\alpha={alpha_d:.2f}$)")
+    ax_morph.plot(xfit + M0, 10**yfit_sph, color="C1", linewidth=2,
+                  label=rf"Spheroid fit ($\alpha={alpha_s:.2f}$)")
 
-plt.figure(figsize=(6, 5))
-plt.scatter(logM_clean[disk], size_kpc_clean[disk], s=1, alpha=0.1, label="Disk-like (n < 2.5)")
-plt.scatter(logM_clean[spheroid], size_kpc_clean[spheroid], s=1, alpha=0.1, label="Spheroid-like (n ≥ 2.5)")
+    ax_morph.set_xlabel(r"$\log_{10}(M_\star/M_\odot)$")
+    ax_morph.set_title("Mass–Size Relation by Morphology (NSA)\n$R_e > 0.5$ kpc")
+    ax_morph.legend(frameon=False, loc="upper left")
 
-plt.plot(xfit + M0, 10**yfit_disk, linewidth=2, label=rf"Disk fit ($\alpha={alpha_d:.2f}$)")
-plt.plot(xfit + M0, 10**yfit_sph, linewidth=2, label=rf"Spheroid fit ($\alpha={alpha_s:.2f}$)")
+    fig.tight_layout()
+    fig.savefig("mass_size_relation_panels.png", dpi=300)
+    plt.close(fig)
 
-plt.xlabel(r"$\log_{10}(M_\star/M_\odot)$")
-plt.ylabel(r"$R_e$ [kpc]")
-plt.yscale("log")
-plt.title("Mass–Size Relation by Morphology (NSA)\n$R_e > 0.5$ kpc")
-plt.legend(frameon=False, loc="upper left")
-plt.tight_layout()
-plt.savefig("mass_size_relation_morphology.png", dpi=300)
-plt.close()
+    print("\nAnalysis complete.")
 
-# ----------------------------------------------------
-# Close file
-# ----------------------------------------------------
 
-hdul.close()
-print("\nAnalysis complete.")
+if __name__ == "__main__":
+    main()